@@ -0,0 +1,95 @@
+from typing import BinaryIO, Iterator, Optional, TextIO
+
+from plottoterminal.lib.figure import Figure
+
+
+class Backend(object):
+    """
+    Writes figures to an output.
+    """
+
+    def write(self, figure: Figure):
+        """
+        Draws the figure and writes it to the output.
+        :param figure: the figure
+        """
+        raise NotImplementedError
+
+
+class TextBackend(Backend):
+    """
+    Writes figures as text line by line.
+    """
+
+    def __init__(self, out: TextIO):
+        """
+        :param out: opened text file
+        """
+        self.out = out
+
+    def write(self, figure: Figure):
+        figure.write(self.out)
+
+
+class BytesBackend(Backend):
+    """
+    Writes figures as encoded bytes. The frame is assembled line by line in a
+    reusable buffer, which is written to the output at once.
+    """
+
+    def __init__(self, out: Optional[BinaryIO] = None,
+                 buffer: Optional[bytearray] = None,
+                 encoding: str = 'utf-8', errors: str = 'strict'):
+        """
+        :param out: opened binary file, only needed for write
+        :param buffer: buffer in which frames are assembled, it grows if
+            necessary
+        :param encoding: the encoding of the output
+        :param errors: handling of characters, which can't be encoded, as for
+            str.encode, e.g., 'replace'
+        """
+        self.out = out
+        self.buffer = buffer if buffer is not None else bytearray()
+        self.encoding = encoding
+        self.errors = errors
+
+    def encode_lines(self, figure: Figure) -> Iterator[bytes]:
+        """
+        Encodes the lines of the canvas from top to bottom.
+        :param figure: a drawn figure
+        :return: iterator over the encoded lines including newlines
+        """
+        encoding = self.encoding
+        errors = self.errors
+        for line in figure.iter_lines():
+            yield line.encode(encoding, errors)
+
+    def render_into(self, figure: Figure, buffer: bytearray,
+                    end: bytes = b'') -> int:
+        """
+        Draws the figure and encodes it into a buffer, starting at its
+        beginning. The buffer is only extended if it is too small, bytes
+        after the frame are left as they are.
+        :param figure: the figure
+        :param buffer: the buffer, e.g., supplied by the caller for reuse
+        :param end: bytes appended to the frame
+        :return: number of bytes of the frame
+        """
+        figure.draw()
+        position = 0
+        for encoded in self.encode_lines(figure):
+            buffer[position:position + len(encoded)] = encoded
+            position += len(encoded)
+        buffer[position:position + len(end)] = end
+        return position + len(end)
+
+    def write(self, figure: Figure, end: bytes = b''):
+        """
+        Draws the figure and writes it to the output in a single write.
+        :param figure: the figure
+        :param end: bytes appended to the frame
+        """
+        length = self.render_into(figure, self.buffer, end)
+        with memoryview(self.buffer) as view:
+            self.out.write(view[:length])
+        self.out.flush()
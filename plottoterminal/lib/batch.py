@@ -0,0 +1,98 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, NamedTuple, Optional, TextIO, Tuple, Dict
+
+from plottoterminal.lib import cli, figure
+
+
+class BatchJob(NamedTuple):
+    """
+    Describes a figure to be exported, the inputs are overlaid as separate
+    series.
+    """
+    output: str
+    inputs: List[str]
+
+
+# number of tasks handed out per worker over the batch, jobs are grouped into
+# tasks only for large batches, such that all workers stay busy until the end
+TASKS_PER_WORKER = 4
+# figures are reused for all jobs of a worker process, one per figure size
+_figures: Dict[Tuple[int, int], figure.Figure] = {}
+
+
+def read_manifest(file: TextIO) -> List[BatchJob]:
+    """
+    Reads a batch manifest. Each line holds the output file name followed by
+    one or several input files or glob patterns, separated by white space.
+    Empty lines and lines starting with # are ignored.
+    :param file: opened manifest file
+    :return: jobs in the order of the manifest
+    """
+    jobs = []
+    for l in file.readlines():
+        fields = l.split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        if len(fields) < 2:
+            raise ValueError(f"Manifest line without inputs: {l.strip()}")
+        jobs.append(BatchJob(fields[0], cli.expand_paths(fields[1:])))
+    return jobs
+
+
+def export_job(job: BatchJob, figsize: Tuple[int, int] = (80, 22),
+               envelope: bool = False, **load_options) -> Tuple[str, float]:
+    """
+    Renders a single figure and writes it to its output file.
+    :param job: the job to export
+    :param figsize: size of the figure
+    :param envelope: if True, plots the envelopes instead of single points
+    :param load_options: options passed to cli.load_file
+    :return: output file name and the time it took to export in seconds
+    """
+    start = time.perf_counter()
+    f = _figures.get(figsize)
+    if f is None:
+        f = _figures[figsize] = figure.Figure(figsize=figsize)
+    else:
+        f.clear()
+
+    for path in job.inputs:
+        x_data, y_data = cli.load_file(path, **load_options)
+        if envelope:
+            f.envelope(x_data, y_data)
+        else:
+            f.scatter(x_data, y_data)
+
+    with open(job.output, 'w') as out:
+        f.write(out)
+    # drop references to the data, the canvas is kept
+    f.plots = []
+
+    return job.output, time.perf_counter() - start
+
+
+def export_batch(jobs: List[BatchJob], figsize: Tuple[int, int] = (80, 22),
+                 envelope: bool = False, workers: Optional[int] = None,
+                 **load_options) -> List[Tuple[str, float]]:
+    """
+    Exports figures in a pool of processes.
+    :param jobs: the jobs to export
+    :param figsize: size of the figures
+    :param envelope: if True, plots the envelopes instead of single points
+    :param workers: number of worker processes, defaults to the number of
+        cores, with one worker all figures are exported in this process
+    :param load_options: options passed to cli.load_file
+    :return: output file names and export times in seconds in job order
+    """
+    export = partial(export_job, figsize=figsize, envelope=envelope,
+                     **load_options)
+    if workers == 1 or len(jobs) < 2:
+        return [export(j) for j in jobs]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (TASKS_PER_WORKER * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(export, jobs, chunksize=chunksize))
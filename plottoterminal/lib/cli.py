@@ -1,15 +1,57 @@
-from typing import TextIO
+import ast
+import glob
+import mmap
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import TextIO, Sequence, Tuple, List, Optional, Callable, \
+    Iterable
+
 from plottoterminal.lib import figure
+from plottoterminal.lib.plots import Chunks
 
+# maps numpy style type codes to the format characters of the struct module
+DTYPES = {
+    'f8': 'd',
+    'f4': 'f',
+    'i8': 'q',
+    'i4': 'i',
+    'i2': 'h',
+    'i1': 'b',
+    'u8': 'Q',
+    'u4': 'I',
+    'u2': 'H',
+    'u1': 'B',
+}
+NPY_MAGIC = b'\x93NUMPY'
+# file formats and the file extensions they are detected by
+FORMATS = {
+    'text': (),
+    'npy': ('.npy',),
+    'raw': ('.bin', '.raw'),
+}
 
-def plot_file(file: TextIO):
+XYData = Tuple[Sequence[float], Sequence[float]]
+
+# estimated memory needed per point of a chunk, which covers the values,
+# the lists holding them and the bins they are converted to
+BYTES_PER_POINT = 128
+# suffixes of memory sizes
+SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def read_xy(file: Iterable[str]) -> XYData:
     """
-    Plots a file of xy format.
-    :param file: file name
+    Reads a file of xy format, two columns separated by white space.
+    :param file: opened text file or its lines
+    :return: x and y data
     """
     x_data = []
     y_data = []
-    for l in file.readlines():
+    for l in file:
         data = list(map(float, l.split()))
         if len(data) != 2:
             raise ValueError("File must contain only two columns.")
@@ -17,9 +59,307 @@ def plot_file(file: TextIO):
         x_data.append(data[0])
         y_data.append(data[1])
 
+    return x_data, y_data
+
+
+def read_xy_chunks(path: str, chunk_size: int) -> Chunks:
+    """
+    Reads a file of xy format in chunks.
+    :param path: file name
+    :param chunk_size: number of lines per chunk
+    :return: iterator over chunks of x and y values
+    """
+    with open(path, 'r') as f:
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                break
+            yield read_xy(lines)
+
+
+def _split_columns(values: Sequence[float], stride: int) -> XYData:
+    """
+    Splits interleaved values into x and y columns without copying. If there
+    is only a single column, it is interpreted as y data.
+    :param values: flat values, stride values per record
+    :param stride: number of values per record
+    :return: x and y data
+    """
+    if stride == 1:
+        return range(len(values)), values
+    return values[0::stride], values[1::stride]
+
+
+def _map_buffer(path: str, dtype: str, offset: int,
+                count: int = -1) -> Sequence[float]:
+    """
+    Memory-maps a file and gives a typed view of its contents. The view is
+    only copied if the byte order of the data differs from the native one.
+    :param path: file name
+    :param dtype: numpy style type, e.g., '<f8'
+    :param offset: number of bytes to skip at the beginning of the file
+    :param count: number of items to map, -1 for all that fit
+    :return: sequence of numbers
+    """
+    byte_order = {'<': 'little', '>': 'big'}.get(dtype[0], sys.byteorder)
+    try:
+        fmt = DTYPES[dtype.lstrip('<>=|')]
+    except KeyError:
+        raise ValueError(f"Unsupported dtype {dtype}.")
+    item_size = struct.calcsize(fmt)
+
+    with open(path, 'rb') as f:
+        # the map stays valid after closing the file
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if count < 0:
+        count = (len(buffer) - offset) // item_size
+    if count <= 0 or offset + count * item_size > len(buffer):
+        raise ValueError("File is too small for the given offset and dtype.")
+
+    values = memoryview(buffer)[offset:offset + count * item_size].cast(fmt)
+    if byte_order != sys.byteorder:
+        values = array(fmt, values)
+        values.byteswap()
+    return values
+
+
+def load_npy(path: str) -> XYData:
+    """
+    Loads a numpy .npy file as a memory map, without requiring numpy. A one
+    dimensional array is interpreted as y data, a two dimensional array
+    holds x and y data in its first two columns.
+    :param path: file name
+    :return: x and y data
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError(f"{path} is not a .npy file.")
+        major, _ = f.read(2)
+        if major == 1:
+            header_length, = struct.unpack('<H', f.read(2))
+        else:
+            header_length, = struct.unpack('<I', f.read(4))
+        header = ast.literal_eval(f.read(header_length).decode('latin1'))
+        offset = f.tell()
+
+    shape = header['shape']
+    if len(shape) not in (1, 2) or (len(shape) == 2 and shape[1] < 2):
+        raise ValueError("Array must be of shape (n,) or (n, m>=2).")
+    count = 1
+    for s in shape:
+        count *= s
+    values = _map_buffer(path, header['descr'], offset, count)
+
+    if len(shape) == 1:
+        return _split_columns(values, 1)
+    if header['fortran_order']:
+        # columns are contiguous
+        return values[:shape[0]], values[shape[0]:2 * shape[0]]
+    return _split_columns(values, shape[1])
+
+
+def load_raw(path: str, dtype: str = '<f8', stride: int = 2,
+             offset: int = 0) -> XYData:
+    """
+    Loads a raw binary file of interleaved records as a memory map.
+    :param path: file name
+    :param dtype: numpy style type of the values, e.g., '<f8'
+    :param stride: number of values per record, x and y are taken from the
+        first two values, a stride of one gives only y data
+    :param offset: number of bytes to skip at the beginning of the file
+    :return: x and y data
+    """
+    if stride < 1:
+        raise ValueError("Stride must be positive.")
+    values = _map_buffer(path, dtype, offset)
+    # drop incomplete records
+    values = values[:len(values) - len(values) % stride]
+    return _split_columns(values, stride)
+
+
+def detect_format(path: str) -> str:
+    """
+    Detects the file format from the file extension.
+    :param path: file name
+    :return: one of FORMATS
+    """
+    for fmt, extensions in FORMATS.items():
+        if path.lower().endswith(extensions):
+            return fmt
+    return 'text'
+
+
+def load_file(path: str, fmt: str = 'auto', dtype: str = '<f8',
+              stride: int = 2, offset: int = 0) -> XYData:
+    """
+    Loads xy data from a file.
+    :param path: file name
+    :param fmt: file format, one of FORMATS or 'auto'
+    :param dtype: type of the values for raw files
+    :param stride: number of values per record for raw files
+    :param offset: number of bytes to skip for raw files
+    :return: x and y data
+    """
+    if fmt == 'auto':
+        fmt = detect_format(path)
+    if fmt == 'npy':
+        return load_npy(path)
+    if fmt == 'raw':
+        return load_raw(path, dtype, stride, offset)
+    with open(path, 'r') as f:
+        return read_xy(f)
+
+
+def _read_xy_packed(path: str) -> XYData:
+    """
+    Reads a text file of xy format in a worker process. The data is packed
+    into arrays, which are transferred back much faster than lists.
+    :param path: file name
+    :return: x and y data
+    """
+    with open(path, 'r') as f:
+        x_data, y_data = read_xy(f)
+    return array('d', x_data), array('d', y_data)
+
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """
+    Expands glob patterns, e.g., 'dumps/*.xy', in the given order. Patterns
+    without wildcards are taken literally.
+    :param patterns: file names or glob patterns
+    :return: file names
+    """
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise ValueError(f"No files match {pattern}.")
+            paths.extend(matches)
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def load_files(paths: List[str], fmt: str = 'auto', dtype: str = '<f8',
+               stride: int = 2, offset: int = 0,
+               jobs: Optional[int] = None) -> List[XYData]:
+    """
+    Loads xy data from several files. Text files are parsed concurrently in a
+    pool of processes, binary files are memory-mapped directly.
+    :param paths: file names
+    :param fmt: file format, one of FORMATS or 'auto'
+    :param dtype: type of the values for raw files
+    :param stride: number of values per record for raw files
+    :param offset: number of bytes to skip for raw files
+    :param jobs: number of worker processes, defaults to the number of cores
+    :return: x and y data per file
+    """
+    formats = [detect_format(p) if fmt == 'auto' else fmt for p in paths]
+    text_paths = [p for p, f in zip(paths, formats) if f == 'text']
+
+    parsed = {}
+    if len(text_paths) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            parsed = dict(zip(
+                text_paths, executor.map(_read_xy_packed, text_paths)))
+
+    return [parsed[p] if p in parsed else
+            load_file(p, f, dtype, stride, offset)
+            for p, f in zip(paths, formats)]
+
+
+def _slice_chunks(path: str, chunk_size: int, **load_options) -> Chunks:
+    """
+    Gives chunks of memory-mapped binary data as views.
+    """
+    x_data, y_data = load_file(path, **load_options)
+    for start in range(0, len(x_data), chunk_size):
+        yield (x_data[start:start + chunk_size],
+               y_data[start:start + chunk_size])
+
+
+def parse_size(size: str) -> int:
+    """
+    Parses a memory size, e.g., '512K', '64M' or '1G'.
+    :param size: number of bytes, optionally with a unit suffix
+    :return: number of bytes
+    """
+    size = size.strip().upper().rstrip('B')
+    factor = SIZE_UNITS.get(size[-1:], 1)
+    if factor != 1:
+        size = size[:-1]
+    return int(float(size) * factor)
+
+
+def chunk_source(path: str, max_memory: int, fmt: str = 'auto',
+                 **load_options) -> Callable[[], Chunks]:
+    """
+    Creates a source, which reads a file in chunks fitting into the given
+    amount of memory each time it is called.
+    :param path: file name
+    :param max_memory: memory per chunk in bytes
+    :param fmt: file format, one of FORMATS or 'auto'
+    :param load_options: options passed to load_file for binary files
+    :return: the source
+    """
+    chunk_size = max(max_memory // BYTES_PER_POINT, 1)
+    if fmt == 'auto':
+        fmt = detect_format(path)
+    if fmt == 'text':
+        return partial(read_xy_chunks, path, chunk_size)
+    return partial(_slice_chunks, path, chunk_size, fmt=fmt, **load_options)
+
+
+def plot_sources(sources: List[Callable[[], Chunks]],
+                 envelope: bool = False):
+    """
+    Plots several series read in chunks from sources overlaid in a single
+    figure.
+    :param sources: sources of chunks of x and y values per series
+    :param envelope: if True, plots the envelopes instead of single points
+    """
+    f = figure.Figure()
+    for source in sources:
+        if envelope:
+            f.envelope_chunks(source)
+        else:
+            f.scatter_chunks(source)
+    f.show()
+
+
+def plot_series(series: List[XYData], envelope: bool = False):
+    """
+    Plots several series of x and y data overlaid in a single figure.
+    :param series: x and y values per series
+    :param envelope: if True, plots the envelopes instead of single points
+    """
     # create figure
     f = figure.Figure()
 
     # plot data
-    f.scatter(x_data, y_data)
+    for x_data, y_data in series:
+        if envelope:
+            f.envelope(x_data, y_data)
+        else:
+            f.scatter(x_data, y_data)
     f.show()
+
+
+def plot_xy(x_data: Sequence[float], y_data: Sequence[float],
+            envelope: bool = False):
+    """
+    Plots x and y data.
+    :param x_data: x values
+    :param y_data: y values
+    :param envelope: if True, plots the envelope instead of single points
+    """
+    plot_series([(x_data, y_data)], envelope)
+
+
+def plot_file(file: TextIO):
+    """
+    Plots a file of xy format.
+    :param file: file name
+    """
+    plot_xy(*read_xy(file))
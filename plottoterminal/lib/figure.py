@@ -1,8 +1,11 @@
-from typing import List, Tuple, Callable, Optional
+import sys
+from functools import lru_cache
+from typing import List, Tuple, Callable, Optional, Iterator, TextIO
 from math import log10
 
-from plottoterminal.lib.plots import BasePlot, Scatter
+from plottoterminal.lib.plots import BasePlot, Scatter, Envelope, Chunks
 from plottoterminal.lib.graph import Graph
+from plottoterminal.lib.scale import LinearScale
 
 AXIS = [  # defines the axis characters
     '─',
@@ -15,6 +18,19 @@ AXIS = [  # defines the axis characters
 ]
 TIMES = '×'
 
+# ANSI escape sequences for setting the foreground color
+ANSI_COLORS = {
+    'black': '\x1b[30m',
+    'red': '\x1b[31m',
+    'green': '\x1b[32m',
+    'yellow': '\x1b[33m',
+    'blue': '\x1b[34m',
+    'magenta': '\x1b[35m',
+    'cyan': '\x1b[36m',
+    'white': '\x1b[37m',
+}
+ANSI_RESET = '\x1b[0m'
+
 CHARS_AXIS = 1  # width and height of the axes lines, usually one character
 
 X_TICK_LABEL_HEIGHT = 1
@@ -38,28 +54,79 @@ Y_TICK_LABEL_PREF_DIGITS = 1
 Y_TICK_LABEL_POST_DIGITS = Y_TICK_LABEL_WIDTH - 2 - Y_TICK_LABEL_PREF_DIGITS
 
 
+@lru_cache(maxsize=64)
+def scale_exponent(interval_length: float) -> int:
+    """
+    Gives the decimal exponent by which tick labels of an axis are scaled.
+    :param interval_length: length of the axis interval
+    :return: exponent
+    """
+    return int(log10(interval_length))
+
+
+@lru_cache(maxsize=1024)
+def format_x_tick_label(value: float) -> str:
+    """
+    Formats an x tick label with variable precision, left aligned.
+    """
+    return '{:<{len}.{prec}f}'.format(
+        value, len=X_TICK_LABEL_WIDTH, prec=X_TICK_LABEL_POST_DIGITS)
+
+
+@lru_cache(maxsize=1024)
+def format_y_tick_label(value: float) -> str:
+    """
+    Formats a y tick label with variable precision, right aligned.
+    """
+    return '{:>{disp}.{dosp}f}'.format(
+        value, disp=Y_TICK_LABEL_WIDTH, dosp=Y_TICK_LABEL_POST_DIGITS)
+
+
 class Figure(object):
     """
     Figure holds the main ingredients of a plot like the axis, axis labels,
     axis.
     """
 
-    def __init__(self, figsize: Tuple[int, int] = (80, 22)):
+    def __init__(self, figsize: Tuple[int, int] = (80, 22),
+                 color: bool = False, overlap: bool = False,
+                 density: bool = False):
         """
         :param figsize: in units of terminal characters, width, height
+        :param color: if True, plots are drawn with ANSI colors
+        :param overlap: if True, points of different plots falling onto the
+            same character are marked
+        :param density: if True, scatter plots are drawn with symbols showing
+            the number of points per character
         """
         self.figsize = figsize
+        self.color = color
+        self.overlap = overlap
+        self.density = density
         # x_lim and y_lim give the minimal and maximal values to be plotted
         self.x_lim: Optional[Tuple[float, float]] = None
         self.y_lim: Optional[Tuple[float, float]] = None
+        # x_view and y_view are fixed limits set by the user, which take
+        # precedence over the limits determined from the data
+        self.x_view: Optional[Tuple[float, float]] = None
+        self.y_view: Optional[Tuple[float, float]] = None
         # graph width and height give the dimensions of the plotting area in
         # number of characters
         self._graph_width: Optional[int] = None
         self._graph_height: Optional[int] = None
+        # tick positions only depend on the graph dimensions
+        self._x_tick_positions: Optional[List[int]] = None
+        self._y_tick_positions: Optional[List[int]] = None
+        # axes_key identifies the state in which the axes were drawn, if it
+        # doesn't change, the axes are not redrawn
+        self._axes_key: Optional[tuple] = None
+        # decorations which reach into the graph region, as row, column and
+        # character, they are restored after the plots are drawn
+        self._decorations: List[Tuple[int, int, str]] = []
         # x2bin and y2bin convert from the x/y values to column/row inside the
-        # graph region
-        self.x2bin: Optional[Callable[[float], int]] = None
-        self.y2bin: Optional[Callable[[float], int]] = None
+        # graph region, single values or in batches with transform
+        self.x2bin: Optional[LinearScale] = None
+        self.y2bin: Optional[LinearScale] = None
         # bin2x and bin2y convert from the column/row inside the graph region to
         # units to x/y values
         self.bin2x: Optional[Callable[[int], float]] = None
@@ -79,6 +146,9 @@ class Figure(object):
         # canvas holds all the characters for the figure
         # TODO: make canvas object
         self.canvas: List[List[str]] = self.init_canvas()
+        # colors is an attribute plane parallel to the canvas holding the color
+        # names of the characters, None means default terminal color
+        self.colors: List[List[Optional[str]]] = self.init_colors()
 
     def draw_horizontal(self, string: str, row: int, start: int, stop: int):
         """
@@ -131,14 +201,57 @@ class Figure(object):
             [' ' for _ in range(self.figsize[0])]
             for _ in range(self.figsize[1])]
 
+    def init_colors(self) -> List[List[Optional[str]]]:
+        """
+        Initializes the color plane with the default color.
+        """
+        return [
+            [None for _ in range(self.figsize[0])]
+            for _ in range(self.figsize[1])]
+
+    def set_xlim(self, x_min: Optional[float] = None,
+                 x_max: Optional[float] = None):
+        """
+        Sets a viewport in x direction, only data inside of it is plotted.
+        Calling it without limits resets the viewport to the data limits.
+        :param x_min: lower x limit
+        :param x_max: upper x limit
+        modifies: self.x_view
+        """
+        if x_min is None or x_max is None:
+            self.x_view = None
+        elif x_min >= x_max:
+            raise ValueError("Lower limit must be smaller than upper limit.")
+        else:
+            self.x_view = (x_min, x_max)
+
+    def set_ylim(self, y_min: Optional[float] = None,
+                 y_max: Optional[float] = None):
+        """
+        Sets a viewport in y direction, only data inside of it is plotted.
+        Calling it without limits resets the viewport to the data limits.
+        :param y_min: lower y limit
+        :param y_max: upper y limit
+        modifies: self.y_view
+        """
+        if y_min is None or y_max is None:
+            self.y_view = None
+        elif y_min >= y_max:
+            raise ValueError("Lower limit must be smaller than upper limit.")
+        else:
+            self.y_view = (y_min, y_max)
+
     def set_x_lim(self, buffer: float = 0.00):
         """
         Determines the x axis value delimiters by taking into account
-        all the plots available.
+        all the plots available. A viewport set by set_xlim is taken as is.
 
         :param buffer: a buffer that is added to the min and max limits
         modifies: self.x_lim
         """
+        if self.x_view is not None:
+            self.x_lim = self.x_view
+            return
 
         x_min = float('inf')
         x_max = 0.0
@@ -158,21 +271,37 @@ class Figure(object):
     def set_y_lim(self, buffer=0.00):
         """
         Determines the y axis value delimiters by taking into account
-        all the plots available.
+        all the plots available. A viewport set by set_ylim is taken as is,
+        if only an x viewport is set, only the data inside is considered,
+        unless there is no data inside.
 
         :param buffer: a buffer that is added to the min and max limits
         modifies: self.y_lim
         """
+        if self.y_view is not None:
+            self.y_lim = self.y_view
+            return
+
         y_min = float('inf')
         y_max = 0
         for p in self.plots:
-            y_min_p = p.min_y()
+            if self.x_view is not None:
+                y_range = p.y_range_in_view(*self.x_view)
+                if y_range is None:
+                    continue
+                y_min_p, y_max_p = y_range
+            else:
+                y_min_p, y_max_p = p.min_y(), p.max_y()
             if y_min > y_min_p:
                 y_min = y_min_p
-            y_max_p = p.max_y()
             if y_max < y_max_p:
                 y_max = y_max_p
 
+        # no data in the x viewport, take the limits of all data
+        if y_min == float('inf'):
+            y_min = min(p.min_y() for p in self.plots)
+            y_max = max(max(p.max_y() for p in self.plots), 0)
+
         # add a buffer
         y_dist = y_max - y_min
         y_buffer = y_dist * buffer / 2
@@ -221,6 +350,9 @@ class Figure(object):
         Returns a list of x tick positions in character units of the graph.
         :return: list of tick positions
         """
+        if self._x_tick_positions is not None:
+            return self._x_tick_positions
+
         # solve diophantine equation
         # w = label_width * n + spacer * (n-1) + rest
         # there should be at least min_n ticks
@@ -260,13 +392,17 @@ class Figure(object):
             label_pos = i * (spacer + X_TICK_LABEL_WIDTH)
             labels.append(label_pos)
 
+        self._x_tick_positions = labels
         return labels
 
     def get_y_tick_positions(self) -> List[int]:
         """
-        Returns a list of x tick positions in character units of the graph.
+        Returns a list of y tick positions in character units of the graph.
         :return: list of tick positions
         """
+        if self._y_tick_positions is not None:
+            return self._y_tick_positions
+
         # solve diophantine equation
         # w = label_width * n + spacer * (n-1) + rest
         # there should be at least min_n ticks
@@ -306,6 +442,7 @@ class Figure(object):
             label_pos = i * (spacer + Y_TICK_LABEL_HEIGHT)
             labels.append(label_pos)
 
+        self._y_tick_positions = labels
         return labels
 
     def get_x_tick_labels(self) -> List[Tuple[int, float]]:
@@ -346,14 +483,12 @@ class Figure(object):
         # m = (x_b_max - t) / x_lim[1]
         m = (self.x_lim[1] - t) / label_positions[-1]
 
-        self.bin2x = lambda x: m * x + t
-        self.x2bin = lambda x_b: int(round((x_b - t) / m, 0))
+        self.x2bin = LinearScale(m, t)
+        self.bin2x = self.x2bin.value
 
         # determine scale factor
         interval_length = self.x_lim[1] - self.x_lim[0]
-        interval_exponent = log10(interval_length)
-        round_interval_exponent = int(interval_exponent)
-        self.scale_exponent_x = round_interval_exponent
+        self.scale_exponent_x = scale_exponent(interval_length)
 
     def init_y_scale(self):
         """
@@ -369,14 +504,12 @@ class Figure(object):
         # m = (x_b_max - t) / x_lim[1]
         m = (self.y_lim[1] - t) / label_positions[-1]
 
-        self.bin2y = lambda y: m * y + t
-        self.y2bin = lambda y_b: int(round((y_b - t) / m, 0))
+        self.y2bin = LinearScale(m, t)
+        self.bin2y = self.y2bin.value
 
         # determine scale factor
         interval_length = self.y_lim[1] - self.y_lim[0]
-        interval_exponent = log10(interval_length)
-        round_interval_exponent = int(interval_exponent)
-        self.scale_exponent_y = round_interval_exponent
+        self.scale_exponent_y = scale_exponent(interval_length)
 
     def draw_x_axis(self):
         """
@@ -386,15 +519,19 @@ class Figure(object):
         # update the scale
         self.set_x_lim()
         self.init_x_scale()
+        self.draw_x_axis_lines()
 
+    def draw_x_axis_lines(self):
+        """
+        Draws the x axis with the current scale.
+        modifies: self.canvas
+        """
         # draw labels
         x_tick_labels = self.get_x_tick_labels()
         x_b_start = Y_LABEL_WIDTH + Y_TICK_LABEL_WIDTH + CHARS_AXIS
         y_b = X_LABEL_HEIGHT
         for t in x_tick_labels:
-            # format label with variable precision, left aligned
-            label = '{:<{len}.{prec}f}'.format(
-                t[1], len=X_TICK_LABEL_WIDTH, prec=X_TICK_LABEL_POST_DIGITS)
+            label = format_x_tick_label(t[1])
             self.canvas[y_b][
             x_b_start + t[0]:x_b_start + t[0] + X_TICK_LABEL_WIDTH] = label
 
@@ -416,14 +553,18 @@ class Figure(object):
         # update the scale
         self.set_y_lim()
         self.init_y_scale()
+        self.draw_y_axis_lines()
 
+    def draw_y_axis_lines(self):
+        """
+        Draws the y axis with the current scale.
+        modifies: self.canvas
+        """
         y_tick_labels = self.get_y_tick_labels()
         y_b_start = X_LABEL_HEIGHT + X_TICK_LABEL_HEIGHT + CHARS_AXIS
         x_b = Y_LABEL_WIDTH
         for t in y_tick_labels:
-            # format label with variable precision, left aligned
-            label = '{:>{disp}.{dosp}f}'.format(
-                t[1], disp=Y_TICK_LABEL_WIDTH, dosp=Y_TICK_LABEL_POST_DIGITS)
+            label = format_y_tick_label(t[1])
             self.canvas[
                 y_b_start + t[0]][x_b:x_b + Y_TICK_LABEL_WIDTH] = label
 
@@ -496,20 +637,121 @@ class Figure(object):
         the terminal.
         :return: the figure in form of a string
         """
-        figure = ''
-        for line in self.canvas[::-1]:
-            figure += ''.join(line)
-            figure += '\n'
-        return figure
-
-    def scatter(self, x: List[float], y: List[float]):
+        return ''.join(self.iter_lines())
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Gives the lines of the canvas from top to bottom, including newlines.
+        :return: iterator over the lines
+        """
+        for line, colors in zip(self.canvas[::-1], self.colors[::-1]):
+            if self.color:
+                yield self.colorize_line(line, colors) + '\n'
+            else:
+                yield ''.join(line) + '\n'
+
+    @staticmethod
+    def colorize_line(line: List[str], colors: List[Optional[str]]) -> str:
+        """
+        Joins a line of characters and inserts ANSI escape sequences.
+        Consecutive characters of the same color are merged into a run, such
+        that only one escape sequence per run is emitted. White space doesn't
+        need a color, it is therefore attached to the current run.
+        :param line: characters of the line
+        :param colors: color names of the characters
+        :return: the line with escape sequences
+        """
+        colored = ''
+        run_start = 0
+        run_color = None
+        for i, run_color in Figure.color_changes(line, colors):
+            colored += ''.join(line[run_start:i])
+            colored += ANSI_COLORS[run_color] if run_color else ANSI_RESET
+            run_start = i
+        colored += ''.join(line[run_start:])
+        if run_color is not None:
+            colored += ANSI_RESET
+        return colored
+
+    @staticmethod
+    def color_changes(line: List[str], colors: List[Optional[str]]) -> List[
+            Tuple[int, Optional[str]]]:
+        """
+        Determines where the color changes in a line, white space is attached
+        to the current run of color.
+        :param line: characters of the line
+        :param colors: color names of the characters
+        :return: positions and colors of the new runs
+        """
+        changes = []
+        run_color = None
+        for i, (char, color) in enumerate(zip(line, colors)):
+            if char == ' ' or color == run_color:
+                continue
+            changes.append((i, color))
+            run_color = color
+        return changes
+
+    def _add_plot(self, plot: BasePlot):
+        """
+        Adds a plot after checking its color.
+        :param plot: the plot
+        :modifies: self.plots
+        """
+        if plot.color is not None and plot.color not in ANSI_COLORS:
+            raise ValueError(f"Unknown color {plot.color}.")
+        self.plots.append(plot)
+
+    def scatter(self, x: List[float], y: List[float],
+                color: Optional[str] = None):
         """
         Scatters x-y data.
 
         :param x: x values
         :param y: y values
+        :param color: name of the color, see ANSI_COLORS
+        """
+        self._add_plot(Scatter(x, y, color=color))
+
+    def envelope(self, x: List[float], y: List[float],
+                 color: Optional[str] = None):
+        """
+        Plots the envelope of x-y data. All values falling into a column of
+        the graph are aggregated and shown as a span from their minimum to
+        their maximum with a marker at their mean. This is suited for a large
+        number of points.
+
+        :param x: x values
+        :param y: y values
+        :param color: name of the color, see ANSI_COLORS
+        """
+        self._add_plot(Envelope(x, y, color=color))
+
+    def scatter_chunks(self, source: Callable[[], Chunks],
+                       color: Optional[str] = None):
         """
-        self.plots.append(Scatter(x, y))
+        Scatters x-y data, which is read in chunks from a source instead of
+        being held in memory. The source is read twice, once to determine
+        the limits and once to draw the points, such that the memory needed
+        is bounded by the size of a chunk.
+
+        :param source: gives an iterator over chunks of x and y values on
+            each call
+        :param color: name of the color, see ANSI_COLORS
+        """
+        self._add_plot(Scatter(None, None, color=color, source=source))
+
+    def envelope_chunks(self, source: Callable[[], Chunks],
+                        color: Optional[str] = None):
+        """
+        Plots the envelope of x-y data, which is read in chunks from a source
+        instead of being held in memory, see scatter_chunks.
+
+        :param source: gives an iterator over chunks of x and y values on
+            each call
+        :param color: name of the color, see ANSI_COLORS
+        """
+        self._add_plot(Envelope(None, None, color=color, source=source))
 
     def set_x_unit(self, unit: str):
         """
@@ -535,13 +777,51 @@ class Figure(object):
         :modifies: self.canvas
         """
         graph = Graph(self.graph_width, self.graph_height, self.plots,
-                      self.x2bin, self.y2bin)
+                      self.x2bin, self.y2bin, self.x_view, self.y_view,
+                      self.overlap, self.density)
 
         graph_canvas = graph.render()
 
         # row-wise replace
         for ir, r in enumerate(graph_canvas):
             self.canvas[LOW_PAD + ir][LEFT_PAD:] = r
+            self.colors[LOW_PAD + ir][LEFT_PAD:] = graph.colors[ir]
+
+    def draw(self):
+        """
+        Draws the axes and plots into the canvas. The axes are only redrawn if
+        the limits, the size, the labels or the units changed since the last
+        drawing.
+        :modifies: self.canvas
+        """
+        if not self.plots:
+            self.decorate_axes()
+            return
+
+        self.set_x_lim()
+        self.set_y_lim()
+        axes_key = (self.x_lim, self.y_lim, self.figsize, self.x_label,
+                    self.y_label, self.unit_x, self.unit_y)
+        if axes_key != self._axes_key:
+            # remove labels of the previous drawing
+            self.blank()
+            self.init_x_scale()
+            self.init_y_scale()
+            self.draw_x_axis_lines()
+            self.draw_y_axis_lines()
+            self.decorate_axes()
+            # the graph region is still blank, everything in it is decoration
+            self._decorations = [
+                (r, c, self.canvas[r][c])
+                for r in range(LOW_PAD, LOW_PAD + self.graph_height)
+                for c in range(LEFT_PAD, self.figsize[0])
+                if self.canvas[r][c] != ' ']
+            self._axes_key = axes_key
+        self.draw_plots()
+        # decorations are drawn over the plots
+        for r, c, char in self._decorations:
+            self.canvas[r][c] = char
+            self.colors[r][c] = None
 
     def export_str(self) -> str:
         """
@@ -549,17 +829,69 @@ class Figure(object):
         a string.
         :return: figure as a string
         """
-        if self.plots:
-            self.draw_x_axis()
-            self.draw_y_axis()
-            self.draw_plots()
-        self.decorate_axes()
+        self.draw()
         figure = self.draw_canvas()
 
         return figure
 
+    def write(self, file: TextIO):
+        """
+        Plots the whole figure with the axes and plots and writes it line by
+        line to a file, without building the whole string.
+        :param file: opened text file
+        """
+        self.draw()
+        file.writelines(self.iter_lines())
+
+    def clear(self):
+        """
+        Removes all plots, labels and units and blanks the canvas, such that
+        the figure can be reused for another plot without reallocation.
+        :modifies: self.plots, self.canvas and everything set by the plots
+        """
+        self.plots = []
+        self.x_lim = None
+        self.y_lim = None
+        self.x2bin = None
+        self.y2bin = None
+        self.bin2x = None
+        self.bin2y = None
+        self.scale_exponent_x = None
+        self.scale_exponent_y = None
+        self.unit_x = None
+        self.unit_y = None
+        self.x_label = ''
+        self.y_label = ''
+        self.x_view = None
+        self.y_view = None
+        self.blank()
+
+    def blank(self):
+        """
+        Blanks the canvas in place, which removes leftovers from a previous
+        drawing.
+        :modifies: self.canvas, self.colors
+        """
+        self._axes_key = None
+        for line, colors in zip(self.canvas, self.colors):
+            line[:] = ' ' * len(line)
+            colors[:] = [None] * len(colors)
+
     def show(self):
         """
-        Shows the figure in stdout.
-        """
-        print(self.export_str())
+        Shows the figure in stdout. The figure is encoded line by line into a
+        buffer and written at once, using the encoding of stdout.
+        """
+        # imported here, as the backends depend on this module
+        from plottoterminal.lib.backend import BytesBackend
+
+        out = getattr(sys.stdout, 'buffer', None)
+        if out is None:
+            print(self.export_str())
+            return
+        # keep the order with text written before
+        sys.stdout.flush()
+        backend = BytesBackend(
+            out, encoding=getattr(sys.stdout, 'encoding', None) or 'utf-8',
+            errors=getattr(sys.stdout, 'errors', None) or 'strict')
+        backend.write(self, end=b'\n')
@@ -1,8 +1,24 @@
-from typing import List, Callable
+from array import array
+from collections import Counter
+from math import log
+from typing import List, Optional, Tuple, Dict
 
-from plottoterminal.lib.plots import BasePlot, Scatter
+from plottoterminal.lib.plots import BasePlot, Scatter, Envelope, Chunks
+from plottoterminal.lib.scale import LinearScale
 
 SYMBOLS = "x*+>"
+# symbol for the span between minimum and maximum of an envelope
+SPAN = '|'
+# symbol for cells which are occupied by several plots
+OVERLAP = '#'
+# symbols for increasing number of points in a cell
+DENSITY = '.:ox@'
+# number of plots that fit into the occupancy of a cell
+MAX_PLOTS = 2 ** 16 - 2
+# counts of points per cell saturate at
+MAX_COUNT = 2 ** 16 - 1
+# colors that are cycled through for the different plots
+COLORS = ['blue', 'red', 'green', 'yellow', 'magenta', 'cyan']
 
 
 class Point(object):
@@ -11,30 +27,190 @@ class Point(object):
 
 class Graph(object):
     def __init__(self, width: int, height: int, plots: List[BasePlot],
-                 x2bin: Callable[[float], int], y2bin: Callable[[float], int]):
+                 x2bin: LinearScale, y2bin: LinearScale,
+                 x_view: Optional[Tuple[float, float]] = None,
+                 y_view: Optional[Tuple[float, float]] = None,
+                 overlap: bool = False, density: bool = False):
         self.width = width
         self.height = height
         self.plots = plots
         self.x2bin = x2bin
         self.y2bin = y2bin
+        # x_view and y_view restrict the plotted data to a viewport, points
+        # outside are clipped
+        self.x_view = x_view
+        self.y_view = y_view
+        # if overlap is True, cells occupied by several plots are marked, if
+        # density is True, symbols of scatter plots follow the number of points
+        self.overlap = overlap
+        self.density = density
+        # occupancy of the cells, row by row: the index of the plot drawn
+        # last plus one (zero for empty cells), whether several plots are
+        # present and the number of scatter points
+        self.top = array('H', [0]) * (self.width * self.height)
+        self.shared = array('B', [0]) * (self.width * self.height)
+        self.counts = array('H', [0]) * (self.width * self.height)
+        # symbols of envelope plots per plot and cell, which differ from the
+        # plot symbol
+        self.marks: Dict[int, Dict[int, str]] = {}
         self.pixels = List[List[Point]]
         self.canvas = [
             [' ' for _ in range(self.width)] for _ in range(self.height)]
+        # colors is an attribute plane parallel to the canvas, which holds the
+        # color name of each character or None for the default color
+        self.colors: List[List[Optional[str]]] = [
+            [None for _ in range(self.width)] for _ in range(self.height)]
 
     def collect(self):
         raise NotImplementedError
 
+    def chunks(self, plot: BasePlot) -> Chunks:
+        """
+        Gives the data of a plot which lies inside the viewport. For data in
+        memory, only the points inside the x view are visited, data from a
+        source is filtered chunk by chunk.
+        :param plot: the plot
+        :return: iterator over chunks of x and y values
+        """
+        x_min, x_max = -float('inf'), float('inf')
+        y_min, y_max = -float('inf'), float('inf')
+        if self.x_view is not None:
+            x_min, x_max = self.x_view
+        if self.y_view is not None:
+            y_min, y_max = self.y_view
+        filter_x = self.x_view is not None and plot.source is not None
+
+        if self.x_view is not None and plot.source is None:
+            chunks = iter([plot.in_view(x_min, x_max)])
+        else:
+            chunks = plot.chunks()
+        for xs, ys in chunks:
+            if filter_x or self.y_view is not None:
+                points = [(px, py) for px, py in zip(xs, ys)
+                          if x_min <= px <= x_max and y_min <= py <= y_max]
+                xs = [p[0] for p in points]
+                ys = [p[1] for p in points]
+            yield xs, ys
+
+    def aggregate(self, plot: BasePlot) -> Tuple[
+            List[float], List[float], List[float], List[int]]:
+        """
+        Aggregates the y values of a plot per column in a single pass over
+        its chunks.
+        :param plot: the plot to aggregate
+        :return: minimum, maximum, mean and count of y values per column,
+            columns without values have a count of zero
+        """
+        inf = float('inf')
+        mins = [inf] * self.width
+        maxs = [-inf] * self.width
+        sums = [0.0] * self.width
+        counts = [0] * self.width
+        for xs, ys in self.chunks(plot):
+            for bx, py in zip(self.x2bin.transform(xs), ys):
+                if not 0 <= bx < self.width:
+                    continue
+                if py < mins[bx]:
+                    mins[bx] = py
+                if py > maxs[bx]:
+                    maxs[bx] = py
+                sums[bx] += py
+                counts[bx] += 1
+        means = [s / c if c else 0.0 for s, c in zip(sums, counts)]
+        return mins, maxs, means, counts
+
+    def occupy(self, ip: int, cells: Dict[int, int]):
+        """
+        Adds the points of a plot to the occupancy of the cells.
+        :param ip: index of the plot
+        :param cells: number of points per cell index, zero if the cell is
+            occupied without points
+        modifies: self.top, self.shared and self.counts
+        """
+        top = self.top
+        shared = self.shared
+        counts = self.counts
+        for i, c in cells.items():
+            if top[i] and top[i] != ip + 1:
+                shared[i] = 1
+            top[i] = ip + 1
+            if c:
+                counts[i] = min(counts[i] + c, MAX_COUNT)
+
     def render(self):
+        if len(self.plots) > MAX_PLOTS:
+            raise ValueError(f"Can't draw more than {MAX_PLOTS} plots.")
+        width = self.width
+        height = self.height
         for ip, p in enumerate(self.plots):
             # handle different plot types differently
-            # here it will be decided which symbol to place
 
             # normal scatter plot:
-            # just put in what comes naturally first and then allow overriding
+            # count the points per cell
             if isinstance(p, Scatter):
-                for px, py in zip(p.x, p.y):
-                    bx = self.x2bin(px)
-                    by = self.y2bin(py)
-                    self.canvas[by][bx] = SYMBOLS[ip % len(SYMBOLS)]
+                cells = Counter()
+                for xs, ys in self.chunks(p):
+                    cells.update([
+                        by * width + bx for bx, by in zip(
+                            self.x2bin.transform(xs),
+                            self.y2bin.transform(ys))
+                        if 0 <= bx < width and 0 <= by < height])
+                self.occupy(ip, cells)
 
+            # envelope plot:
+            # occupy the span of values per column and mark the mean
+            elif isinstance(p, Envelope):
+                mins, maxs, means, counts = self.aggregate(p)
+                # empty columns are skipped, give them a finite value
+                bys_min = self.y2bin.transform(
+                    [m if c else 0.0 for m, c in zip(mins, counts)])
+                bys_max = self.y2bin.transform(
+                    [m if c else 0.0 for m, c in zip(maxs, counts)])
+                bys_mean = self.y2bin.transform(means)
+                marks = self.marks[ip] = {}
+                cells = {}
+                for bx in range(width):
+                    if not counts[bx]:
+                        continue
+                    by_min = max(bys_min[bx], 0)
+                    by_max = min(bys_max[bx], height - 1)
+                    for by in range(by_min, by_max + 1):
+                        marks[by * width + bx] = SPAN
+                        cells[by * width + bx] = 0
+                    by_mean = bys_mean[bx]
+                    if by_min <= by_mean <= by_max:
+                        # the mean is shown with the plot symbol
+                        del marks[by_mean * width + bx]
+                # envelopes don't contribute to the density of points
+                self.occupy(ip, cells)
+
+        self.draw()
         return self.canvas
+
+    def draw(self):
+        """
+        Draws the symbols of all cells in a single pass over the occupancy.
+        The plot drawn last is shown on top, as if the plots were drawn over
+        each other.
+        modifies: self.canvas and self.colors
+        """
+        max_count = max(self.counts, default=0)
+        log_max_count = log(max_count) if max_count > 1 else 1.0
+        for i, t in enumerate(self.top):
+            if not t:
+                continue
+            top = t - 1
+            if top in self.marks:
+                symbol = self.marks[top].get(i, SYMBOLS[top % len(SYMBOLS)])
+            elif self.density and self.counts[i]:
+                level = log(self.counts[i]) / log_max_count
+                symbol = DENSITY[round(level * (len(DENSITY) - 1))]
+            else:
+                symbol = SYMBOLS[top % len(SYMBOLS)]
+            if self.overlap and self.shared[i]:
+                symbol = OVERLAP
+
+            by, bx = divmod(i, self.width)
+            self.canvas[by][bx] = symbol
+            self.colors[by][bx] = self.plots[top].color or \
+                COLORS[top % len(COLORS)]
@@ -0,0 +1,245 @@
+import os
+import shutil
+import sys
+import time
+from typing import List, Optional, TextIO, Tuple
+
+from plottoterminal.lib.figure import Figure
+from plottoterminal.lib.plots import BasePlot
+from plottoterminal.lib.pyramid import MinMaxPyramid
+
+# maps keys to viewer actions
+KEYS = {
+    'h': 'left', '\x1b[D': 'left',
+    'l': 'right', '\x1b[C': 'right',
+    'k': 'up', '\x1b[A': 'up',
+    'j': 'down', '\x1b[B': 'down',
+    '+': 'zoom_in', '=': 'zoom_in',
+    '-': 'zoom_out',
+    'i': 'y_zoom_in',
+    'o': 'y_zoom_out',
+    'r': 'reset',
+    'q': 'quit', '\x1b': 'quit', '\x03': 'quit',
+}
+HELP = "h/l/j/k: pan  +/-: zoom x  i/o: zoom y  r: reset  q: quit"
+# fraction of the view that is panned per key press
+PAN = 0.25
+# factor by which the view is zoomed per key press
+ZOOM = 2.0
+# smallest width of a view relative to its center or the full data range,
+# such that the limits stay distinguishable in floating point
+MIN_ZOOM = 1e-9
+# number of buckets per graph column requested from the pyramids
+BUCKETS_PER_COLUMN = 2
+
+ALT_SCREEN_ON = '\x1b[?1049h'
+ALT_SCREEN_OFF = '\x1b[?1049l'
+HIDE_CURSOR = '\x1b[?25l'
+SHOW_CURSOR = '\x1b[?25h'
+CLEAR_SCREEN = '\x1b[2J'
+CLEAR_LINE = '\x1b[2K'
+
+
+def _fit_figsize(figsize: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Reduces a figure size to the nearest size, for which tick labels can be
+    placed on both axes.
+    :param figsize: in units of terminal characters, width, height
+    :return: the largest fitting size, which is not larger than figsize
+    """
+    width, height = figsize
+    # the axes are solved separately, the other dimension is kept small to
+    # make the trial figures cheap
+    while True:
+        try:
+            Figure(figsize=(width, 1)).get_x_tick_positions()
+            break
+        except ValueError:
+            if width <= 1:
+                raise
+            width -= 1
+    while True:
+        try:
+            Figure(figsize=(1, height)).get_y_tick_positions()
+            break
+        except ValueError:
+            if height <= 1:
+                raise
+            height -= 1
+    return width, height
+
+
+def _zoom(lim: Tuple[float, float], full: Tuple[float, float],
+          factor: float) -> Tuple[float, float]:
+    """
+    Scales an interval around its center. Zooming in stops at a minimal
+    width, the interval is kept as it is then.
+    :param lim: the interval
+    :param full: the interval of all data
+    :param factor: factor by which the width is scaled
+    :return: the scaled interval
+    """
+    center = lim[0] + (lim[1] - lim[0]) / 2
+    half = factor * (lim[1] - lim[0]) / 2
+    min_half = MIN_ZOOM * max(abs(center), full[1] - full[0]) / 2
+    if factor < 1 and half < min_half:
+        return lim
+    return center - half, center + half
+
+
+def _widen(lim: Tuple[float, float]) -> Tuple[float, float]:
+    """
+    Widens an interval of zero length, which can't be scaled.
+    """
+    if lim[0] == lim[1]:
+        return lim[0] - 0.5, lim[1] + 0.5
+    return lim
+
+
+class Viewer(object):
+    """
+    Interactive viewer, which lets the user pan and zoom the data with the
+    keyboard. The data is summarized once in min/max pyramids, such that a
+    frame costs about the same for any size of the data.
+    """
+
+    def __init__(self, series: List[Tuple[List[float], List[float]]],
+                 figsize: Optional[Tuple[int, int]] = None,
+                 color: bool = True):
+        """
+        :param series: x and y values per series
+        :param figsize: in units of terminal characters, width, height,
+            defaults to the terminal size, it is reduced to the nearest size
+            for which tick labels can be placed
+        :param color: if True, plots are drawn with ANSI colors
+        """
+        if figsize is None:
+            size = shutil.get_terminal_size()
+            # leave a line for the status
+            figsize = (size.columns, size.lines - 1)
+        self.figure = Figure(figsize=_fit_figsize(figsize), color=color)
+
+        self.pyramids = []
+        for x, y in series:
+            plot = BasePlot(x, y)
+            plot.sort_by_x()
+            self.pyramids.append(MinMaxPyramid(plot.x_sorted, plot.y_sorted))
+
+        y_ranges = [p.y_range() for p in self.pyramids]
+        self.x_full = _widen((min(p.x[0] for p in self.pyramids),
+                              max(p.x[-1] for p in self.pyramids)))
+        self.y_full = _widen((min(r[0] for r in y_ranges),
+                              max(r[1] for r in y_ranges)))
+        self.x_view = self.x_full
+        self.y_view = self.y_full
+
+        # frame holds the lines currently shown in the terminal
+        self.frame: List[str] = []
+        self.status = HELP
+
+    def handle(self, key: str) -> bool:
+        """
+        Changes the view according to a key press.
+        :param key: the key as read from the terminal
+        :return: False if the viewer should quit
+        modifies: self.x_view and self.y_view
+        """
+        action = KEYS.get(key)
+        x_min, x_max = self.x_view
+        y_min, y_max = self.y_view
+        dx = x_max - x_min
+        dy = y_max - y_min
+
+        if action == 'quit':
+            return False
+        elif action == 'left':
+            self.x_view = (x_min - PAN * dx, x_max - PAN * dx)
+        elif action == 'right':
+            self.x_view = (x_min + PAN * dx, x_max + PAN * dx)
+        elif action == 'down':
+            self.y_view = (y_min - PAN * dy, y_max - PAN * dy)
+        elif action == 'up':
+            self.y_view = (y_min + PAN * dy, y_max + PAN * dy)
+        elif action in ('zoom_in', 'zoom_out'):
+            factor = 1 / ZOOM if action == 'zoom_in' else ZOOM
+            self.x_view = _zoom(self.x_view, self.x_full, factor)
+        elif action in ('y_zoom_in', 'y_zoom_out'):
+            factor = 1 / ZOOM if action == 'y_zoom_in' else ZOOM
+            self.y_view = _zoom(self.y_view, self.y_full, factor)
+        elif action == 'reset':
+            self.x_view = self.x_full
+            self.y_view = self.y_full
+        return True
+
+    def render(self) -> List[str]:
+        """
+        Renders the current view. Series with few points in view are
+        scattered, otherwise the buckets of the pyramid are drawn as
+        envelopes, where the mean marker shows the middle of the range.
+        :return: the lines of the figure
+        """
+        start = time.perf_counter()
+        f = self.figure
+        f.plots = []
+        f.set_xlim(*self.x_view)
+        f.set_ylim(*self.y_view)
+
+        x_min = self.x_view[0]
+        max_buckets = BUCKETS_PER_COLUMN * f.graph_width
+        levels = []
+        for p in self.pyramids:
+            level, xs, y_min, y_max = p.query(*self.x_view, max_buckets)
+            levels.append(level)
+            if level == 0:
+                f.scatter(xs, y_min)
+            else:
+                # the first bucket may start left of the view
+                xs = [x if x > x_min else x_min for x in xs]
+                f.envelope(xs + xs, list(y_min) + list(y_max))
+
+        lines = f.export_str().splitlines()
+        self.status = "x: [{:.4g}, {:.4g}]  y: [{:.4g}, {:.4g}]  " \
+                      "level: {}  {:.1f} ms  {}".format(
+                          *self.x_view, *self.y_view, max(levels),
+                          (time.perf_counter() - start) * 1000, HELP)
+        return lines
+
+    def draw(self, out: TextIO):
+        """
+        Draws the current view to the terminal. Only lines which changed with
+        respect to the previous frame are rewritten.
+        :param out: the terminal
+        modifies: self.frame
+        """
+        lines = self.render()
+        for i, line in enumerate(lines):
+            if i >= len(self.frame) or self.frame[i] != line:
+                out.write(f'\x1b[{i + 1};1H{line}')
+        width = self.figure.figsize[0]
+        out.write(f'\x1b[{len(lines) + 1};1H{CLEAR_LINE}'
+                  f'{self.status[:width]}')
+        out.flush()
+        self.frame = lines
+
+    def run(self):
+        """
+        Runs the viewer until the user quits. The terminal is put into raw
+        mode and restored afterwards.
+        """
+        # only available on unix like systems
+        import termios
+        import tty
+
+        fd = sys.stdin.fileno()
+        out = sys.stdout
+        settings = termios.tcgetattr(fd)
+        try:
+            tty.setraw(fd)
+            out.write(ALT_SCREEN_ON + HIDE_CURSOR + CLEAR_SCREEN)
+            self.draw(out)
+            while self.handle(os.read(fd, 8).decode(errors='ignore')):
+                self.draw(out)
+        finally:
+            out.write(SHOW_CURSOR + ALT_SCREEN_OFF)
+            out.flush()
+            termios.tcsetattr(fd, termios.TCSADRAIN, settings)
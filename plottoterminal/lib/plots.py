@@ -1,4 +1,8 @@
-from typing import List, Optional
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import List, Optional, Sequence, Tuple, Callable, Iterable
+
+Chunks = Iterable[Tuple[Sequence[float], Sequence[float]]]
 
 
 class BasePlot(object):
@@ -6,22 +10,126 @@ class BasePlot(object):
     Represents a certain type of plot.
     """
     def __init__(self, x: List[float], y: List[float],
-                 z: Optional[List[float]] = None):
+                 z: Optional[List[float]] = None,
+                 color: Optional[str] = None,
+                 source: Optional[Callable[[], Chunks]] = None):
         self.x = x
         self.y = y
         self.z = z
-        pass
+        # color is the name of the ANSI color the plot is drawn in, if None,
+        # a color is picked from the color cycle
+        self.color = color
+        # source replaces x and y for data which is not held in memory, each
+        # call gives an iterator over chunks of x and y values
+        self.source = source
+        # extents of the data from the source, determined on first use
+        self._extents: Optional[Tuple[float, float, float, float]] = None
+        # x_sorted and y_sorted hold the data sorted by x, which serves as an
+        # index for viewports, they are built on first use
+        self.x_sorted: Optional[Sequence[float]] = None
+        self.y_sorted: Optional[Sequence[float]] = None
+
+    def sort_by_x(self):
+        """
+        Builds the index of the data sorted by x. Data which is already
+        sorted is not copied.
+        :modifies: self.x_sorted and self.y_sorted
+        """
+        x = self.x
+        if all(a <= b for a, b in zip(x, islice(x, 1, None))):
+            self.x_sorted, self.y_sorted = x, self.y
+        else:
+            order = sorted(range(len(x)), key=x.__getitem__)
+            self.x_sorted = [x[i] for i in order]
+            self.y_sorted = [self.y[i] for i in order]
+
+    def in_view(self, x_min: float, x_max: float) -> Tuple[
+            Sequence[float], Sequence[float]]:
+        """
+        Gives the data with x values in the interval [x_min, x_max] by binary
+        search in the sorted data.
+        :param x_min: lower x limit
+        :param x_max: upper x limit
+        :return: x and y values in view, sorted by x
+        """
+        if self.x_sorted is None:
+            self.sort_by_x()
+        start = bisect_left(self.x_sorted, x_min)
+        stop = bisect_right(self.x_sorted, x_max, start)
+        return self.x_sorted[start:stop], self.y_sorted[start:stop]
+
+    def chunks(self) -> Chunks:
+        """
+        Gives the data in chunks, data held in memory is a single chunk.
+        :return: iterator over chunks of x and y values
+        """
+        if self.source is None:
+            return iter([(self.x, self.y)])
+        return self.source()
+
+    def extents(self) -> Tuple[float, float, float, float]:
+        """
+        Determines the extents of the data from the source in a single pass
+        over the chunks.
+        :return: minimal x, maximal x, minimal y and maximal y value
+        """
+        if self._extents is None:
+            inf = float('inf')
+            x_min, x_max, y_min, y_max = inf, -inf, inf, -inf
+            for xs, ys in self.chunks():
+                if not len(xs):
+                    continue
+                x_min = min(x_min, min(xs))
+                x_max = max(x_max, max(xs))
+                y_min = min(y_min, min(ys))
+                y_max = max(y_max, max(ys))
+            self._extents = (x_min, x_max, y_min, y_max)
+        return self._extents
+
+    def y_range_in_view(self, x_min: float, x_max: float) -> Optional[
+            Tuple[float, float]]:
+        """
+        Determines the minimal and maximal y value of the data with x values
+        in the interval [x_min, x_max]. Data from a source is read in a
+        single pass over the chunks.
+        :param x_min: lower x limit
+        :param x_max: upper x limit
+        :return: minimal and maximal y value, None if there is no data
+        """
+        if self.source is None:
+            _, ys = self.in_view(x_min, x_max)
+            if not len(ys):
+                return None
+            return min(ys), max(ys)
+
+        y_min, y_max = float('inf'), -float('inf')
+        for xs, ys in self.chunks():
+            ys = [py for px, py in zip(xs, ys) if x_min <= px <= x_max]
+            if ys:
+                y_min = min(y_min, min(ys))
+                y_max = max(y_max, max(ys))
+        if y_min > y_max:
+            return None
+        return y_min, y_max
 
     def min_x(self) -> float:
+        if self.source is not None:
+            return self.extents()[0]
         return min(self.x)
 
     def max_x(self) -> float:
+        if self.source is not None:
+            return self.extents()[1]
         return max(self.x)
 
     def min_y(self) -> float:
+        if self.source is not None:
+            return self.extents()[2]
         return min(self.y)
 
     def max_y(self) -> float:
+        if self.source is not None:
+            return self.extents()[3]
         return max(self.y)
 
 
@@ -31,5 +139,21 @@ class Scatter(BasePlot):
     """
 
     def __init__(self, x: List[float], y: List[float],
-                 z: Optional[List[float]] = None):
-        super().__init__(x, y, z)
+                 z: Optional[List[float]] = None,
+                 color: Optional[str] = None,
+                 source: Optional[Callable[[], Chunks]] = None):
+        super().__init__(x, y, z, color, source)
+
+
+class Envelope(BasePlot):
+    """
+    Represents an envelope plot, the y values are aggregated per column of
+    the graph and drawn as a span from minimum to maximum with a marker at the
+    mean.
+    """
+
+    def __init__(self, x: List[float], y: List[float],
+                 z: Optional[List[float]] = None,
+                 color: Optional[str] = None,
+                 source: Optional[Callable[[], Chunks]] = None):
+        super().__init__(x, y, z, color, source)
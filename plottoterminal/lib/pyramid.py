@@ -0,0 +1,82 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Sequence, Tuple
+
+
+class MinMaxPyramid(object):
+    """
+    Multi-resolution summary of xy data sorted by x. Level k groups 2^k
+    consecutive points into a bucket, for which the x range and the minimal
+    and maximal y values are stored. A query for an x interval is answered
+    from the finest level which gives not more than a given number of buckets,
+    such that its cost doesn't depend on the size of the data.
+    """
+
+    def __init__(self, x: Sequence[float], y: Sequence[float]):
+        """
+        :param x: x values, sorted
+        :param y: y values
+        """
+        self.x = x
+        self.y = y
+        # levels[k - 1] holds the buckets of level k as arrays of
+        # x_min, x_max, y_min, y_max
+        self.levels: List[Tuple[array, array, array, array]] = []
+
+        x_min, x_max, y_min, y_max = x, x, y, y
+        while len(x_min) > 1:
+            x_min, x_max, y_min, y_max = self._coarsen(
+                x_min, x_max, y_min, y_max)
+            self.levels.append((x_min, x_max, y_min, y_max))
+
+    @staticmethod
+    def _coarsen(x_min: Sequence[float], x_max: Sequence[float],
+                 y_min: Sequence[float], y_max: Sequence[float]) -> Tuple[
+            array, array, array, array]:
+        """
+        Merges pairs of neighboring buckets, a single last bucket is kept.
+        """
+        n = len(x_min)
+        return (
+            array('d', x_min[0::2]),
+            array('d', [x_max[i + 1] if i + 1 < n else x_max[i]
+                        for i in range(0, n, 2)]),
+            array('d', [min(y_min[i:i + 2]) for i in range(0, n, 2)]),
+            array('d', [max(y_max[i:i + 2]) for i in range(0, n, 2)]),
+        )
+
+    def y_range(self) -> Tuple[float, float]:
+        """
+        Gives the minimal and maximal y value of the whole data.
+        """
+        if not self.levels:
+            return min(self.y), max(self.y)
+        _, _, y_min, y_max = self.levels[-1]
+        return y_min[0], y_max[0]
+
+    def query(self, x_min: float, x_max: float, max_buckets: int) -> Tuple[
+            int, Sequence[float], Sequence[float], Sequence[float]]:
+        """
+        Summarizes the data in the interval [x_min, x_max].
+        :param x_min: lower x limit
+        :param x_max: upper x limit
+        :param max_buckets: maximal number of buckets to be returned
+        :return: level, and x positions, minimal and maximal y values of the
+            buckets, at level zero the points themselves
+        """
+        start = bisect_left(self.x, x_min)
+        stop = bisect_right(self.x, x_max, start)
+
+        level = 0
+        while stop > start and level < len(self.levels) and \
+                ((stop - 1) >> level) - (start >> level) >= max_buckets:
+            level += 1
+        if level == 0:
+            ys = self.y[start:stop]
+            return level, self.x[start:stop], ys, ys
+
+        xs, _, y_min, y_max = self.levels[level - 1]
+        start >>= level
+        # include the bucket holding the last point
+        stop = ((stop - 1) >> level) + 1
+        return level, xs[start:stop], y_min[start:stop], y_max[start:stop]
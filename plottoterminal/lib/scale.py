@@ -0,0 +1,59 @@
+from math import floor
+from typing import List, Sequence
+
+try:
+    import numpy
+except ImportError:  # numpy is optional
+    numpy = None
+
+
+class LinearScale(object):
+    """
+    Linear map between values and bins (columns or rows of the graph),
+    value = slope * bin + offset. Values are converted to bins in batches
+    with precomputed coefficients, bins are rounded half up.
+    """
+
+    def __init__(self, slope: float, offset: float):
+        """
+        :param slope: change of value per bin
+        :param offset: value at bin zero
+        """
+        self.slope = slope
+        self.offset = offset
+        # bin = floor(value * inverse_slope + shift)
+        self.inverse_slope = 1 / slope
+        self.shift = 0.5 - offset / slope
+
+    def __call__(self, value: float) -> int:
+        """
+        Converts a single value to a bin.
+        """
+        return floor(value * self.inverse_slope + self.shift)
+
+    def transform(self, values: Sequence[float]) -> Sequence[int]:
+        """
+        Converts values to bins. Numpy arrays are converted vectorized.
+        :param values: values to be converted
+        :return: bins
+        """
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            return numpy.floor(
+                values * self.inverse_slope + self.shift).astype(numpy.intp)
+        inverse_slope = self.inverse_slope
+        shift = self.shift
+        return [floor(v * inverse_slope + shift) for v in values]
+
+    def value(self, b: int) -> float:
+        """
+        Converts a bin to the value it represents.
+        """
+        return self.slope * b + self.offset
+
+    def values(self, bins: Sequence[int]) -> List[float]:
+        """
+        Converts bins to the values they represent.
+        """
+        slope = self.slope
+        offset = self.offset
+        return [slope * b + offset for b in bins]
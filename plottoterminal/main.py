@@ -1,8 +1,21 @@
 #!/usr/bin/env python
 import sys
 import argparse
+from typing import List, Optional
 
-from plottoterminal.lib import cli
+from plottoterminal.lib import cli, batch, interactive
+
+
+def positive_int(value: str) -> int:
+    """
+    Parses a positive integer argument.
+    :param value: the argument
+    :return: the integer
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be positive, got {value}")
+    return number
 
 
 class Parser(object):
@@ -15,10 +28,64 @@ class Parser(object):
             prog='plottoterminal',
             description='Plot data to the terminal'
         )
-        self.parser.add_argument("file", help="file containing xy data")
+        self.parser.add_argument(
+            "files", nargs='*', metavar='file',
+            help="files containing xy data, glob patterns are expanded, "
+                 "several files are plotted as separate series")
+        self.parser.add_argument(
+            "--format", default='auto',
+            choices=['auto'] + list(cli.FORMATS),
+            help="file format, by default detected from the file extension "
+                 "(.npy: numpy array, .bin/.raw: raw binary, else text)")
+        self.parser.add_argument(
+            "--dtype", default='<f8',
+            help="type of the values in raw binary files, e.g., <f8, <f4, <i4")
+        self.parser.add_argument(
+            "--stride", type=int, default=2,
+            help="number of values per record in raw binary files, x and y "
+                 "are taken from the first two values")
+        self.parser.add_argument(
+            "--offset", type=int, default=0,
+            help="number of header bytes to skip in raw binary files")
+        self.parser.add_argument(
+            "--envelope", action='store_true',
+            help="plot the min/max span and mean of the values per column "
+                 "instead of single points, suited for many points")
+        self.parser.add_argument(
+            "--jobs", type=positive_int, default=None,
+            help="number of processes parsing text files concurrently, "
+                 "defaults to the number of cores")
+        self.parser.add_argument(
+            "--max-memory", type=cli.parse_size, metavar='SIZE',
+            help="read the files in chunks such that the data takes at most "
+                 "about SIZE bytes of memory, e.g., 64M, the files are read "
+                 "twice instead of being held in memory")
+        self.parser.add_argument(
+            "--interactive", action='store_true',
+            help="explore the data in an interactive viewer with keyboard "
+                 "pan and zoom")
+        self.parser.add_argument(
+            "--batch", metavar='MANIFEST',
+            help="export figures to files instead of plotting, each line of "
+                 "the manifest holds an output file followed by input files")
 
-    def parse_arguments(self):
-        return self.parser.parse_args()
+    def parse_arguments(self, argv: Optional[List[str]] = None):
+        args = self.parser.parse_args(argv)
+        if not args.files and not args.batch:
+            self.parser.error("no input files given")
+        # reject options which would be ignored silently
+        if args.batch and args.interactive:
+            self.parser.error("--batch can't be combined with --interactive")
+        if args.batch and args.max_memory:
+            self.parser.error("--batch can't be combined with --max-memory")
+        if args.interactive and args.max_memory:
+            self.parser.error(
+                "--interactive can't be combined with --max-memory")
+        if args.interactive and args.envelope:
+            self.parser.error(
+                "--interactive can't be combined with --envelope, the viewer "
+                "draws envelopes when zoomed out")
+        return args
 
 
 def main():
@@ -29,8 +96,30 @@ def main():
 
     # take arguments from sys.argv
     args = parser.parse_arguments()
-    with open(args.file, 'r') as f:
-        cli.plot_file(f)
+    if args.batch:
+        with open(args.batch, 'r') as f:
+            jobs = batch.read_manifest(f)
+        timings = batch.export_batch(
+            jobs, envelope=args.envelope, workers=args.jobs, fmt=args.format,
+            dtype=args.dtype, stride=args.stride, offset=args.offset)
+        for output, seconds in timings:
+            print(f"{output}: {seconds * 1000:.1f} ms")
+        return
+
+    paths = cli.expand_paths(args.files)
+    if args.max_memory:
+        sources = [cli.chunk_source(
+            p, args.max_memory, args.format, dtype=args.dtype,
+            stride=args.stride, offset=args.offset) for p in paths]
+        cli.plot_sources(sources, args.envelope)
+        return
+
+    series = cli.load_files(paths, args.format, args.dtype, args.stride,
+                            args.offset, args.jobs)
+    if args.interactive:
+        interactive.Viewer(series).run()
+    else:
+        cli.plot_series(series, args.envelope)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,61 @@
+import io
+import sys
+from unittest import TestCase, mock
+
+from plottoterminal.lib import figure
+from plottoterminal.lib.backend import BytesBackend, TextBackend
+from plottoterminal.lib.utils import linspace
+
+
+class TestBackend(TestCase):
+    def setUp(self):
+        xs = linspace(-1, 1, 200)
+        self.figures = []
+        for color in (False, True):
+            f = figure.Figure(figsize=(30, 10), color=color)
+            f.set_x_label("x")
+            f.set_y_label("x*x*x")
+            f.scatter(xs, [x*x*x for x in xs])
+            f.scatter(xs, [-x for x in xs])
+            self.figures.append(f)
+
+    def test_bytes(self):
+        for f in self.figures:
+            expected = f.export_str().encode()
+
+            out = io.BytesIO()
+            BytesBackend(out).write(f)
+            self.assertEqual(expected, out.getvalue())
+
+            # the frame is written into the supplied buffer, which is only
+            # grown if necessary
+            buffer = bytearray(b'#' * 2000)
+            length = BytesBackend().render_into(f, buffer)
+            self.assertEqual(2000, len(buffer))
+            self.assertEqual(expected, buffer[:length])
+            buffer = bytearray(10)
+            length = BytesBackend().render_into(f, buffer, end=b'\n')
+            self.assertEqual(expected + b'\n', buffer[:length])
+
+    def test_encoding(self):
+        for f in self.figures:
+            expected = f.export_str().encode('latin-1', 'replace')
+            self.assertIn(b'?', expected)
+
+            out = io.BytesIO()
+            BytesBackend(out, encoding='latin-1', errors='replace').write(f)
+            self.assertEqual(expected, out.getvalue())
+
+            # show follows the encoding of stdout
+            out = io.BytesIO()
+            stdout = io.TextIOWrapper(out, encoding='latin-1',
+                                      errors='replace')
+            with mock.patch.object(sys, 'stdout', stdout):
+                f.show()
+            self.assertEqual(expected + b'\n', out.getvalue())
+
+    def test_text(self):
+        for f in self.figures:
+            out = io.StringIO()
+            TextBackend(out).write(f)
+            self.assertEqual(f.export_str(), out.getvalue())
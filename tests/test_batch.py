@@ -0,0 +1,56 @@
+import io
+import os
+import tempfile
+import time
+from unittest import TestCase, mock
+
+from plottoterminal.lib import batch, cli, figure
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _export_pid(job, **kwargs):
+    """
+    Stands in for batch.export_job and reports the worker process.
+    """
+    time.sleep(0.1)
+    return str(os.getpid()), 0.0
+
+
+class TestBatch(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_export_batch(self):
+        fixture = os.path.join(FIXTURES, 'test.xy')
+        outputs = [os.path.join(self.tmp.name, f'{i}.txt') for i in range(3)]
+        manifest = io.StringIO(
+            '# output inputs\n'
+            f'{outputs[0]} {fixture}\n'
+            '\n'
+            f'{outputs[1]} {fixture} {fixture}\n'
+            f'{outputs[2]} {os.path.join(FIXTURES, "*.xy")}\n')
+        jobs = batch.read_manifest(manifest)
+        self.assertEqual([[fixture], [fixture, fixture], [fixture]],
+                         [j.inputs for j in jobs])
+
+        f = figure.Figure()
+        f.scatter(*cli.load_file(fixture))
+        expected = f.export_str()
+
+        for workers in (1, 2):
+            timings = batch.export_batch(jobs, workers=workers)
+            self.assertEqual(outputs, [t[0] for t in timings])
+            for output in outputs[0], outputs[2]:
+                with open(output) as o:
+                    self.assertEqual(expected, o.read())
+
+    def test_export_batch_workers(self):
+        jobs = [batch.BatchJob(f'{i}.txt', []) for i in range(8)]
+        with mock.patch.object(batch, 'export_job', _export_pid):
+            timings = batch.export_batch(jobs, workers=4)
+        self.assertEqual(8, len(timings))
+        self.assertGreater(len({t[0] for t in timings}), 1)
@@ -0,0 +1,135 @@
+import os
+import struct
+import tempfile
+import tracemalloc
+from array import array
+from unittest import TestCase
+
+from plottoterminal.lib import cli, figure
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def write_npy(path, values, shape, descr='<f8', fortran_order=False):
+    """
+    Writes a .npy file (version 1.0) without numpy.
+    """
+    header = repr({'descr': descr, 'fortran_order': fortran_order,
+                   'shape': shape}).encode('latin1')
+    header += b' ' * (63 - (len(header) + 10) % 64) + b'\n'
+    with open(path, 'wb') as f:
+        f.write(cli.NPY_MAGIC + b'\x01\x00')
+        f.write(struct.pack('<H', len(header)))
+        f.write(header)
+        f.write(struct.pack(descr[0] + f'{len(values)}d', *values))
+
+
+class TestCli(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_text(self):
+        x, y = cli.load_file(os.path.join(FIXTURES, 'test.xy'))
+        self.assertEqual([1.0, 3.0, 6.0, 7.0, 10.0], x[:5])
+        self.assertEqual([2.0, 4.0, 3.0, 2.0, 1.0], y[:5])
+
+    def test_npy(self):
+        path = os.path.join(self.tmp.name, 'data.npy')
+        write_npy(path, [0, 1, 2, 3, 4, 5], (3, 2))
+        x, y = cli.load_file(path)
+        self.assertEqual([0, 2, 4], list(x))
+        self.assertEqual([1, 3, 5], list(y))
+
+        write_npy(path, [0, 1, 2, 3, 4, 5], (3, 2), fortran_order=True)
+        x, y = cli.load_npy(path)
+        self.assertEqual([0, 1, 2], list(x))
+        self.assertEqual([3, 4, 5], list(y))
+
+        write_npy(path, [5, 6, 7], (3,), descr='>f8')
+        x, y = cli.load_npy(path)
+        self.assertEqual([0, 1, 2], list(x))
+        self.assertEqual([5, 6, 7], list(y))
+
+    def test_raw(self):
+        path = os.path.join(self.tmp.name, 'data.bin')
+        with open(path, 'wb') as f:
+            f.write(b'head')
+            array('f', [0, 1, 9, 2, 3, 9, 4, 5, 9, 6]).tofile(f)
+        x, y = cli.load_file(path, dtype='<f4', stride=3, offset=4)
+        self.assertEqual([0, 2, 4], list(x))
+        self.assertEqual([1, 3, 5], list(y))
+
+        with self.assertRaises(ValueError):
+            cli.load_raw(path, dtype='<c16')
+
+    def test_multiple_files(self):
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp.name, f'host{i}.xy')
+            with open(path, 'w') as f:
+                f.write(f'0 {i}\n1 {i + 1}\n')
+            paths.append(path)
+        npy_path = os.path.join(self.tmp.name, 'host3.npy')
+        write_npy(npy_path, [0, 3, 1, 4], (2, 2))
+
+        expanded = cli.expand_paths(
+            [os.path.join(self.tmp.name, '*.xy'), npy_path])
+        self.assertEqual(paths + [npy_path], expanded)
+        with self.assertRaises(ValueError):
+            cli.expand_paths([os.path.join(self.tmp.name, '*.csv')])
+
+        for jobs in (1, 2):
+            series = cli.load_files(expanded, jobs=jobs)
+            self.assertEqual(
+                [([0, 1], [i, i + 1]) for i in range(4)],
+                [(list(x), list(y)) for x, y in series])
+
+    def test_chunks(self):
+        self.assertEqual(64 * 1024 ** 2, cli.parse_size('64M'))
+        self.assertEqual(1536, cli.parse_size('1.5kb'))
+
+        path = os.path.join(FIXTURES, 'test.xy')
+        f = figure.Figure()
+        f.scatter(*cli.load_file(path))
+        f.envelope(*cli.load_file(path))
+        string_expected = f.export_str()
+
+        f = figure.Figure()
+        f.scatter_chunks(cli.chunk_source(path, 7 * cli.BYTES_PER_POINT))
+        f.envelope_chunks(cli.chunk_source(path, 7 * cli.BYTES_PER_POINT))
+        self.assertEqual(string_expected, f.export_str())
+
+        # the y limits follow the data in the x viewport in both cases
+        for plot_chunks in (False, True):
+            f = figure.Figure()
+            if plot_chunks:
+                f.scatter_chunks(cli.chunk_source(
+                    path, 7 * cli.BYTES_PER_POINT))
+            else:
+                f.scatter(*cli.load_file(path))
+            f.set_xlim(0, 7)
+            f.export_str()
+            self.assertEqual((2.0, 4.0), f.y_lim)
+
+    def test_max_memory(self):
+        """
+        Tests that the peak memory doesn't grow with the size of the file.
+        """
+        peaks = []
+        for lines in (20000, 80000):
+            path = os.path.join(self.tmp.name, f'{lines}.xy')
+            with open(path, 'w') as f:
+                for i in range(lines):
+                    f.write(f'{i} {i % 97}\n')
+
+            tracemalloc.start()
+            f = figure.Figure()
+            f.scatter_chunks(cli.chunk_source(path, 100 * 1024))
+            f.export_str()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        self.assertLess(peaks[1], 1.2 * peaks[0])
@@ -2,6 +2,7 @@ from math import sin
 from unittest import TestCase
 
 from plottoterminal.lib import figure
+from plottoterminal.lib.graph import SYMBOLS
 from plottoterminal.lib.utils import linspace, PI
 
 
@@ -166,3 +167,176 @@ class TestFigure(TestCase):
 
         string_tested = f.export_str()
         self.assertEqual(string_expected, string_tested)
+
+    def test_color(self):
+        """
+        Tests that colors are emitted once per run of equally colored
+        characters.
+        """
+        line = list('x x  *>│')
+        colors = ['red', 'red', 'red', None, None, 'blue', 'blue', None]
+        string_tested = figure.Figure.colorize_line(line, colors)
+        string_expected = \
+            '\x1b[31mx x  \x1b[34m*>\x1b[0m│'
+        self.assertEqual(string_expected, string_tested)
+
+        f = figure.Figure(figsize=(57, 20), color=True)
+        xs = linspace(-10, 10, 200)
+        f.scatter(xs, [x*x for x in xs])
+        f.scatter(xs, [-x*x for x in xs], color='green')
+        string_tested = f.export_str()
+        # one run per line and plot at most
+        self.assertLessEqual(string_tested.count('\x1b[34m'), 20)
+        self.assertIn('\x1b[32m', string_tested)
+        f.show()
+
+        # unknown colors are rejected by all plot types
+        source = lambda: iter([(xs, xs)])
+        for add, data in ((f.scatter, (xs, xs)), (f.envelope, (xs, xs)),
+                          (f.scatter_chunks, (source,)),
+                          (f.envelope_chunks, (source,))):
+            with self.assertRaises(ValueError):
+                add(*data, color='pink')
+        self.assertEqual(2, len(f.plots))
+
+    def test_envelope(self):
+        """
+        Tests aggregating many points per column into an envelope.
+        """
+        f = figure.Figure(figsize=(30, 10))
+        xs = linspace(-1, 1, 2000)
+        ys = [x + (0.5 if i % 2 else -0.5) for i, x in enumerate(xs)]
+        f.set_x_label("x")
+        f.set_y_label("x")
+        f.envelope(xs, ys)
+        string_tested = f.export_str()
+        f.show()
+
+        string_expected = \
+            "   1.5ᐃ                |||    \n" \
+            "      │           |||||xxx    \n" \
+            "      │       |||||xxxx|||    \n" \
+            "x -0.0├  |||||xxxxx|||||      \n" \
+            "      │|||xxxx|||||           \n" \
+            "      │xxx|||||               \n" \
+            "  -1.5├|||                    \n" \
+            "      └┴─────┴─────┴─────┴───ᐅ\n" \
+            "       -1.0  -0.3  0.3   1.0  \n" \
+            "                  x           \n"
+        self.assertEqual(string_expected, string_tested)
+
+    def test_viewport(self):
+        """
+        Tests zooming into a part of the data, points outside are clipped.
+        """
+        f = figure.Figure(figsize=(30, 10))
+        xs = linspace(-1, 1, 200)
+        ys = [x*x*x for x in xs]
+        f.set_x_label("x")
+        f.set_y_label("x*x*x")
+        # unsorted data is indexed
+        f.scatter(xs[::-1], ys[::-1])
+        f.set_xlim(0.0, 1.0)
+        string_tested = f.export_str()
+        f.show()
+        self.assertEqual((0.0, 1.0), f.x_lim)
+        self.assertEqual((0.0, 1.0), f.y_lim)
+        self.assertNotIn('-', string_tested.splitlines()[-2])
+
+        f.set_ylim(-0.5, 0.5)
+        string_zoomed = f.export_str()
+        f.show()
+        self.assertEqual((-0.5, 0.5), f.y_lim)
+        self.assertNotEqual(string_tested, string_zoomed)
+
+        f.set_xlim()
+        f.set_ylim()
+        f.export_str()
+        self.assertEqual((-1.0, 1.0), f.x_lim)
+        with self.assertRaises(ValueError):
+            f.set_xlim(1, 0)
+
+    def test_axes_cache(self):
+        """
+        Tests that axes are only redrawn when they change.
+        """
+        f = figure.Figure(figsize=(30, 10))
+        xs = linspace(-1, 1, 200)
+        f.scatter(xs, [x*x*x for x in xs])
+        string_expected = f.export_str()
+
+        # same limits, only the plot is redrawn
+        f.plots = []
+        f.scatter(xs[::-1], [x*x*x for x in xs[::-1]])
+        self.assertEqual(string_expected, f.export_str())
+        f.canvas[figure.LOW_PAD - 1][-2] = '#'
+        self.assertIn('#', f.export_str())
+
+        # changed labels or limits redraw the axes
+        f.set_x_label("x")
+        self.assertNotIn('#', f.export_str())
+        f.set_xlim(0, 1)
+        self.assertIn('0.5', f.export_str())
+        f.set_xlim()
+        f.set_x_label("")
+        self.assertEqual(string_expected, f.export_str())
+
+    def test_overlap_density(self):
+        """
+        Tests marking overlapping plots and showing the density of points.
+        """
+        xs = linspace(-1, 1, 200)
+        f = figure.Figure(figsize=(30, 10), overlap=True)
+        f.scatter(xs, [x*x*x for x in xs])
+        f.scatter(xs, [-x for x in xs])
+        string_overlap = f.export_str()
+        f.show()
+        self.assertIn('   0.0├    xxxx###xxxx        \n', string_overlap)
+
+        f = figure.Figure(figsize=(30, 10), density=True)
+        f.scatter(xs, [x*x*x for x in xs])
+        string_density = f.export_str()
+        f.show()
+        self.assertIn('   0.0├    x@@@@@@@@@x        \n', string_density)
+
+    def test_decorations_over_plots(self):
+        """
+        Tests that decorations reaching into the graph region are not
+        overwritten by the plots, also if the axes are not redrawn.
+        """
+        f = figure.Figure(figsize=(30, 10))
+        xs = linspace(-10, 10, 100)
+        f.scatter(xs, xs)
+        f.set_y_unit("banana")
+        self.assertIn("[banana]", f.export_str())
+        self.assertIn("[banana]", f.export_str())
+
+    def test_empty_viewport(self):
+        """
+        Tests an x viewport without any data inside.
+        """
+        f = figure.Figure(figsize=(30, 10))
+        xs = linspace(0, 10, 100)
+        f.scatter(xs, [-x for x in xs])
+        f.set_xlim(20, 30)
+        string_tested = f.export_str()
+        self.assertEqual((-10.0, 0), f.y_lim)
+        # nothing is drawn into the graph region
+        graph = ''.join(line[figure.LEFT_PAD:]
+                        for line in string_tested.splitlines()[:-3])
+        self.assertNotIn('x', graph)
+
+    def test_many_plots(self):
+        """
+        Tests that the symbol of the plot drawn last is shown for many plots.
+        """
+        f = figure.Figure(figsize=(160, 22))
+        for i in range(66):
+            f.scatter([i], [0])
+        f.envelope([70, 70], [0, 1])
+        lines = f.export_str().splitlines()
+        # the row of y = 0 holds one point per plot and the envelope
+        graph_row = lines[-figure.LOW_PAD - 1][figure.LEFT_PAD:]
+        self.assertEqual(
+            ''.join(SYMBOLS[i % len(SYMBOLS)] for i in range(66)) + '|',
+            graph_row.replace(' ', ''))
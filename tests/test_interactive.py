@@ -0,0 +1,78 @@
+import io
+from unittest import TestCase
+
+from plottoterminal.lib.interactive import Viewer
+from plottoterminal.lib.pyramid import MinMaxPyramid
+from plottoterminal.lib.utils import linspace
+
+
+class TestInteractive(TestCase):
+    def test_pyramid(self):
+        xs = list(range(10))
+        ys = [0, 5, 1, 2, 9, 3, 4, 4, 7, 8]
+        p = MinMaxPyramid(xs, ys)
+        self.assertEqual(4, len(p.levels))
+        self.assertEqual((0, 9), p.y_range())
+
+        level, bxs, y_min, y_max = p.query(2, 7, 10)
+        self.assertEqual(0, level)
+        self.assertEqual([2, 3, 4, 5, 6, 7], list(bxs))
+        self.assertEqual(ys[2:8], list(y_max))
+
+        level, bxs, y_min, y_max = p.query(2, 7, 3)
+        self.assertEqual(1, level)
+        self.assertEqual([2, 4, 6], list(bxs))
+        self.assertEqual([1, 3, 4], list(y_min))
+        self.assertEqual([2, 9, 4], list(y_max))
+
+        level, bxs, y_min, y_max = p.query(1, 9, 1)
+        self.assertEqual(4, level)
+        self.assertEqual([0], list(bxs))
+
+    def test_viewer(self):
+        xs = linspace(-1, 1, 10000)
+        v = Viewer([(xs, [x * x for x in xs])], figsize=(40, 12),
+                   color=False)
+        out = io.StringIO()
+        v.draw(out)
+        self.assertIn('level: 8', v.status)
+
+        for key in '++++++':
+            self.assertTrue(v.handle(key))
+        self.assertAlmostEqual(2 / 64, v.x_view[1] - v.x_view[0])
+        v.draw(out)
+        self.assertIn('level: 2', v.status)
+
+        v.handle('\x1b[C')
+        self.assertAlmostEqual(-0.5 / 64, v.x_view[0])
+        v.handle('+')
+        v.draw(out)
+        self.assertIn('level: 1', v.status)
+        v.handle('+')
+        v.draw(out)
+        self.assertIn('level: 0', v.status)
+
+        v.handle('r')
+        self.assertEqual((-1, 1), v.x_view)
+        self.assertFalse(v.handle('q'))
+
+    def test_viewer_figsize(self):
+        xs = linspace(-1, 1, 100)
+        v = Viewer([(xs, xs)], figsize=(80, 42), color=False)
+        self.assertEqual((80, 41), v.figure.figsize)
+        v.draw(io.StringIO())
+        self.assertEqual(41, len(v.frame))
+
+        v = Viewer([(xs, xs)], figsize=(300, 22), color=False)
+        self.assertLessEqual(v.figure.figsize[0], 231)
+        v.draw(io.StringIO())
+
+    def test_viewer_zoom_limit(self):
+        xs = linspace(1000, 1001, 100)
+        v = Viewer([(xs, xs)], figsize=(80, 22), color=False)
+        for key in '+' * 70 + 'i' * 70:
+            self.assertTrue(v.handle(key))
+        self.assertLess(v.x_view[0], v.x_view[1])
+        self.assertLess(v.y_view[0], v.y_view[1])
+        v.draw(io.StringIO())
+        self.assertEqual(22, len(v.frame))
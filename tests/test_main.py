@@ -0,0 +1,32 @@
+import contextlib
+import io
+from unittest import TestCase
+
+from plottoterminal.main import Parser, positive_int
+
+
+class TestParser(TestCase):
+    def assertRejected(self, argv):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                Parser().parse_arguments(argv)
+
+    def test_options(self):
+        args = Parser().parse_arguments(
+            ['a.xy', 'b.xy', '--max-memory', '64M', '--envelope'])
+        self.assertEqual(['a.xy', 'b.xy'], args.files)
+        self.assertEqual(64 * 1024 ** 2, args.max_memory)
+
+        self.assertRejected([])
+        self.assertRejected(['a.xy', '--interactive', '--max-memory', '64M'])
+        self.assertRejected(['a.xy', '--interactive', '--envelope'])
+        self.assertRejected(['--batch', 'jobs.txt', '--max-memory', '64M'])
+        self.assertRejected(['--batch', 'jobs.txt', '--interactive'])
+
+    def test_jobs(self):
+        args = Parser().parse_arguments(['a.xy', '--jobs', '3'])
+        self.assertEqual(3, args.jobs)
+        self.assertRejected(['a.xy', 'b.xy', '--jobs', '0'])
+        self.assertRejected(['a.xy', 'b.xy', '--jobs', '-2'])
+        self.assertRejected(['a.xy', 'b.xy', '--jobs', 'x'])
+        self.assertEqual(1, positive_int('1'))
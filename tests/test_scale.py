@@ -0,0 +1,14 @@
+from unittest import TestCase
+
+from plottoterminal.lib.scale import LinearScale
+
+
+class TestScale(TestCase):
+    def test_transform(self):
+        s = LinearScale(0.5, -1.0)
+        values = [-1.0, -0.76, -0.75, 0.0, 0.49, 1.0, -1.5]
+        bins = [0, 0, 1, 2, 3, 4, -1]
+        self.assertEqual(bins, s.transform(values))
+        self.assertEqual(bins, [s(v) for v in values])
+        self.assertEqual([-1.0, 0.0, 1.0], s.values([0, 2, 4]))
+        self.assertEqual(0.0, s.value(2))